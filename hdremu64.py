@@ -7,7 +7,9 @@ Prebuilt Python 3.13 Standalone Release
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import struct, time, threading, random
+import sys, time, threading, random
+from array import array
+from collections import deque
 from pathlib import Path
 
 # ============================================================================
@@ -17,6 +19,8 @@ PROJECTEMU64_VERSION = "1.0"
 PROJECTEMU64_BUILD = "Tkinter 600x400 60 fps Edition"
 PROJECTEMU64_COPYRIGHT = "© 2025 FlamesCo / Samsoft"
 WINDOW_TITLE = "ProjectEMU64 Tkinter 600x400 60 fps"
+FRAME_INTERVAL = 1/60
+CYCLES_PER_FRAME = 93_750  # CPU instructions batched into each 60 Hz frame
 
 # Controller constants
 CONTROLLER_A = 0x0001
@@ -27,6 +31,32 @@ CONTROLLER_DPAD_DOWN = 0x0020
 CONTROLLER_DPAD_LEFT = 0x0040
 CONTROLLER_DPAD_RIGHT = 0x0080
 
+# Tk keysym -> controller button bit
+KEYMAP = {
+    "space": CONTROLLER_A,
+    "Return": CONTROLLER_B,
+    "Up": CONTROLLER_DPAD_UP,
+    "Down": CONTROLLER_DPAD_DOWN,
+    "Left": CONTROLLER_DPAD_LEFT,
+    "Right": CONTROLLER_DPAD_RIGHT,
+}
+
+# KSEG0/KSEG1 virtual addresses map onto physical memory by dropping the top bits
+PHYS_MASK = 0x1FFFFFFF
+PAGE_SHIFT = 12
+BLOCK_MAX = 64  # instructions per cached basic block
+BLOCK_CACHE_MAX = 4096  # cached blocks before the cache is flushed
+POLL_BLOCKS = 16  # blocks between stop/deadline checks in a batch
+
+def s32(value):
+    """Reinterpret an unsigned 32-bit register value as signed."""
+    return value - 0x100000000 if value & 0x80000000 else value
+
+def put_ppm(image, data):
+    """Blit binary PPM bytes into a PhotoImage, naming the format so Tk
+    decodes it directly instead of probing every registered image handler."""
+    image.tk.call(image.name, "put", data, "-format", "ppm")
+
 # ============================================================================
 # CPU Core (simplified interpreter)
 # ============================================================================
@@ -39,71 +69,343 @@ class ProjectEMU64CPU:
         self.cp0 = [0]*32
         self.running = False
         self.cycles = 0
-
-    def reset(self):
-        self.regs = [0]*32
+        self.log_callback = None
+        self.run_block = self.run_block_fast
+        self.memory = None
+        self.block_cache = {}  # PC -> [(handler, rs, rt, rd, imm), ...]
+        self.page_blocks = {}  # physical page -> PCs of blocks decoded from it
+
+        # Opcode -> bound handler; decode picks one, execute calls it directly
+        self.special_ops = {
+            0x00: self._op_sll, 0x02: self._op_srl, 0x03: self._op_sra,
+            0x08: self._op_jr, 0x09: self._op_jalr,
+            0x20: self._op_addu, 0x21: self._op_addu,
+            0x22: self._op_subu, 0x23: self._op_subu,
+            0x24: self._op_and, 0x25: self._op_or, 0x26: self._op_xor,
+            0x27: self._op_nor, 0x2A: self._op_slt, 0x2B: self._op_sltu,
+        }
+        self.primary_ops = {
+            0x02: self._op_j, 0x03: self._op_jal,
+            0x04: self._op_beq, 0x05: self._op_bne,
+            0x08: self._op_addiu, 0x09: self._op_addiu,
+            0x0A: self._op_slti, 0x0B: self._op_sltiu,
+            0x0C: self._op_andi, 0x0D: self._op_ori, 0x0E: self._op_xori,
+            0x0F: self._op_lui, 0x23: self._op_lw, 0x2B: self._op_sw,
+        }
+        self.branch_ops = {
+            self._op_jr, self._op_jalr, self._op_j, self._op_jal,
+            self._op_beq, self._op_bne,
+        }
+
+    def reset(self, log_callback=None):
+        # Clear all architectural state, including cp0 and hi/lo, so a
+        # restart never inherits values from the previous run.
+        self.regs[:] = [0]*32
+        self.cp0[:] = [0]*32
+        self.hi = self.lo = 0
         self.pc = 0x80000000
         self.next_pc = self.pc + 4
         self.cycles = 0
+        self.block_cache.clear()
+        self.page_blocks.clear()
+        # Pick the block runner once so the untraced path never tests for
+        # a logger or formats a trace line per instruction.
+        self.log_callback = log_callback
+        self.run_block = self.run_block_fast if log_callback is None else self.run_block_traced
 
     def fetch(self, memory, addr):
         return memory.read_word(addr)
 
-    def execute(self, memory, log_callback=None):
+    def decode(self, instr):
+        op = instr >> 26
+        rs = (instr >> 21) & 31
+        rt = (instr >> 16) & 31
+        rd = (instr >> 11) & 31
+        if op == 0:
+            funct = instr & 0x3F
+            handler = self.special_ops.get(funct, self._op_nop)
+            if rd == 0 and funct not in (0x08, 0x09):
+                handler = self._op_nop  # writes to $zero are discarded
+            return handler, rs, rt, rd, (instr >> 6) & 31
+        handler = self.primary_ops.get(op, self._op_nop)
+        if op in (0x02, 0x03):
+            imm = instr & 0x3FFFFFF
+        elif op in (0x0C, 0x0D, 0x0E, 0x0F):
+            imm = instr & 0xFFFF
+        else:
+            imm = instr & 0xFFFF
+            if imm & 0x8000:
+                imm -= 0x10000
+        if rt == 0 and op not in (0x02, 0x03, 0x04, 0x05, 0x2B):
+            handler = self._op_nop
+        return handler, rs, rt, rd, imm
+
+    def decode_block(self, memory, pc):
+        # Decode straight-line code up to and including a jump/branch and its
+        # delay slot, so hot loops pay the decode cost only once.
+        if len(self.block_cache) >= BLOCK_CACHE_MAX:
+            # Code that never loops (or runs off into unmapped memory) would
+            # otherwise grow the cache without bound; start over instead.
+            self.block_cache.clear()
+            self.page_blocks.clear()
+            memory.code_pages.clear()
+        block = []
+        addr = pc
+        while len(block) < BLOCK_MAX:
+            entry = self.decode(self.fetch(memory, addr))
+            block.append(entry)
+            addr = (addr + 4) & 0xFFFFFFFF
+            if entry[0] in self.branch_ops:
+                block.append(self.decode(self.fetch(memory, addr)))
+                addr = (addr + 4) & 0xFFFFFFFF
+                break
+        self.block_cache[pc] = block
+        first = (pc & PHYS_MASK) >> PAGE_SHIFT
+        last = ((addr - 4) & PHYS_MASK) >> PAGE_SHIFT
+        for page in range(first, last + 1):
+            self.page_blocks.setdefault(page, set()).add(pc)
+            memory.code_pages.add(page)
+        return block
+
+    def invalidate_pages(self, pages):
+        for page in pages:
+            for pc in self.page_blocks.pop(page, ()):
+                self.block_cache.pop(pc, None)
+        pages.clear()
+
+    def run_block_fast(self, block):
+        for handler, rs, rt, rd, imm in block:
+            # Step into the delay slot first; branch handlers then redirect next_pc
+            npc = self.next_pc
+            self.pc = npc
+            self.next_pc = (npc + 4) & 0xFFFFFFFF
+            handler(rs, rt, rd, imm)
+
+    def run_block_traced(self, block):
+        memory, log_callback, fetch = self.memory, self.log_callback, self.fetch
+        for handler, rs, rt, rd, imm in block:
+            pc = self.pc
+            log_callback(f"[PC: {pc:08X}] 0x{fetch(memory, pc):08X}")
+            npc = self.next_pc
+            self.pc = npc
+            self.next_pc = (npc + 4) & 0xFFFFFFFF
+            handler(rs, rt, rd, imm)
+
+    def execute(self, memory):
+        """Run the single block at the current PC."""
+        return self.run_blocks(memory, 1)
+
+    def run(self, memory, budget, deadline=None):
+        """Run cached blocks back to back until `budget` instructions retire,
+        the monotonic `deadline` passes, or the core is stopped."""
         if not self.running:
-            return
-        instr = self.fetch(memory, self.pc)
-        if log_callback:
-            log_callback(f"[PC: {self.pc:08X}] 0x{instr:08X}")
-        self.pc += 4
-        self.cycles += 1
+            return 0
+        return self.run_blocks(memory, budget, deadline)
+
+    def run_blocks(self, memory, budget, deadline=None, _monotonic=time.monotonic):
+        self.memory = memory
+        cache, decode_block = self.block_cache, self.decode_block
+        run_block = self.run_block
+        stale = memory.stale_pages
+        done = blocks = 0
+        while done < budget:
+            if stale:
+                self.invalidate_pages(stale)
+            pc = self.pc
+            block = cache.get(pc) or decode_block(memory, pc)
+            run_block(block)
+            done += len(block)
+            blocks += 1
+            if blocks % POLL_BLOCKS == 0:
+                if not self.running or (deadline is not None and _monotonic() >= deadline):
+                    break
+        self.cycles += done
+        return done
+
+    # ---------------- Instruction handlers ----------------
+    def _op_nop(self, rs, rt, rd, imm):
+        pass
+
+    def _op_sll(self, rs, rt, rd, sa):
+        self.regs[rd] = (self.regs[rt] << sa) & 0xFFFFFFFF
+
+    def _op_srl(self, rs, rt, rd, sa):
+        self.regs[rd] = self.regs[rt] >> sa
+
+    def _op_sra(self, rs, rt, rd, sa, _s32=s32):
+        self.regs[rd] = (_s32(self.regs[rt]) >> sa) & 0xFFFFFFFF
+
+    def _op_jr(self, rs, rt, rd, imm):
+        self.next_pc = self.regs[rs]
+
+    def _op_jalr(self, rs, rt, rd, imm):
+        target = self.regs[rs]
+        if rd:
+            self.regs[rd] = (self.pc + 4) & 0xFFFFFFFF
+        self.next_pc = target
+
+    def _op_addu(self, rs, rt, rd, imm):
+        self.regs[rd] = (self.regs[rs] + self.regs[rt]) & 0xFFFFFFFF
+
+    def _op_subu(self, rs, rt, rd, imm):
+        self.regs[rd] = (self.regs[rs] - self.regs[rt]) & 0xFFFFFFFF
+
+    def _op_and(self, rs, rt, rd, imm):
+        self.regs[rd] = self.regs[rs] & self.regs[rt]
+
+    def _op_or(self, rs, rt, rd, imm):
+        self.regs[rd] = self.regs[rs] | self.regs[rt]
+
+    def _op_xor(self, rs, rt, rd, imm):
+        self.regs[rd] = self.regs[rs] ^ self.regs[rt]
+
+    def _op_nor(self, rs, rt, rd, imm):
+        self.regs[rd] = ~(self.regs[rs] | self.regs[rt]) & 0xFFFFFFFF
+
+    def _op_slt(self, rs, rt, rd, imm, _s32=s32):
+        self.regs[rd] = int(_s32(self.regs[rs]) < _s32(self.regs[rt]))
+
+    def _op_sltu(self, rs, rt, rd, imm):
+        self.regs[rd] = int(self.regs[rs] < self.regs[rt])
+
+    def _op_j(self, rs, rt, rd, target):
+        self.next_pc = (self.pc & 0xF0000000) | (target << 2)
+
+    def _op_jal(self, rs, rt, rd, target):
+        self.regs[31] = (self.pc + 4) & 0xFFFFFFFF
+        self.next_pc = (self.pc & 0xF0000000) | (target << 2)
+
+    def _op_beq(self, rs, rt, rd, imm):
+        if self.regs[rs] == self.regs[rt]:
+            self.next_pc = (self.pc + (imm << 2)) & 0xFFFFFFFF
+
+    def _op_bne(self, rs, rt, rd, imm):
+        if self.regs[rs] != self.regs[rt]:
+            self.next_pc = (self.pc + (imm << 2)) & 0xFFFFFFFF
+
+    def _op_addiu(self, rs, rt, rd, imm):
+        self.regs[rt] = (self.regs[rs] + imm) & 0xFFFFFFFF
+
+    def _op_slti(self, rs, rt, rd, imm, _s32=s32):
+        self.regs[rt] = int(_s32(self.regs[rs]) < imm)
+
+    def _op_sltiu(self, rs, rt, rd, imm):
+        self.regs[rt] = int(self.regs[rs] < (imm & 0xFFFFFFFF))
+
+    def _op_andi(self, rs, rt, rd, imm):
+        self.regs[rt] = self.regs[rs] & imm
+
+    def _op_ori(self, rs, rt, rd, imm):
+        self.regs[rt] = self.regs[rs] | imm
+
+    def _op_xori(self, rs, rt, rd, imm):
+        self.regs[rt] = self.regs[rs] ^ imm
+
+    def _op_lui(self, rs, rt, rd, imm):
+        self.regs[rt] = imm << 16
+
+    def _op_lw(self, rs, rt, rd, imm):
+        self.regs[rt] = self.memory.read_word((self.regs[rs] + imm) & 0xFFFFFFFF)
+
+    def _op_sw(self, rs, rt, rd, imm):
+        self.memory.write_word((self.regs[rs] + imm) & 0xFFFFFFFF, self.regs[rt])
 
 # ============================================================================
 # Memory Controller
 # ============================================================================
 class ProjectEMU64Memory:
     def __init__(self):
-        self.rdram = bytearray(8 * 1024 * 1024)
+        # RDRAM is an array of host-order 32-bit words, so an aligned word
+        # access is a single index with no slice or unpack
+        self.rdram = array("I", bytes(8 * 1024 * 1024))
         self.rom = None
         self.rom_size = 0
+        self.code_pages = set()   # pages the CPU has decoded blocks from
+        self.stale_pages = set()  # code pages written since, pending invalidation
 
     def load_rom(self, data):
-        self.rom = bytearray(data)
+        # Decode the big-endian image to host-order words once and copy them
+        # into the bottom of RDRAM. Callers must not load while the CPU runs.
+        words = array("I")
+        words.frombytes(bytes(data) + bytes(-len(data) % 4))
+        if sys.byteorder == "little":
+            words.byteswap()
+        copy = min(len(words), len(self.rdram))
+        self.rdram[:copy] = words[:copy]
+        self.rom = data
         self.rom_size = len(data)
-        copy = min(self.rom_size, len(self.rdram))
-        self.rdram[:copy] = self.rom[:copy]
-
-    def read_word(self, addr):
-        if addr < len(self.rdram)-3:
-            return struct.unpack(">I", self.rdram[addr:addr+4])[0]
+        self.stale_pages |= self.code_pages
+        self.code_pages.clear()
+
+    # Hot paths bind globals as default arguments (LOAD_FAST, not LOAD_GLOBAL)
+    def read_word(self, addr, _mask=PHYS_MASK):
+        addr &= _mask
+        if addr & 3:
+            return self.read_word_unaligned(addr)
+        if addr >> 2 < len(self.rdram):
+            return self.rdram[addr >> 2]
         return 0
 
+    def read_word_unaligned(self, addr):
+        shift = (addr & 3) * 8
+        hi = self.read_word(addr & ~3)
+        lo = self.read_word((addr & ~3) + 4)
+        return ((hi << shift) | (lo >> (32 - shift))) & 0xFFFFFFFF
+
+    def write_word(self, addr, value, _mask=PHYS_MASK, _page_shift=PAGE_SHIFT):
+        addr &= _mask & ~3  # SW requires alignment; the low bits are ignored
+        if addr >> 2 < len(self.rdram):
+            self.rdram[addr >> 2] = value
+            page = addr >> _page_shift
+            if page in self.code_pages:
+                self.code_pages.discard(page)
+                self.stale_pages.add(page)
+
 # ============================================================================
 # Simple GPU/PPU (placeholder render)
 # ============================================================================
 class ProjectEMU64PPU:
     def __init__(self):
         self.width, self.height = 320, 240
-        self.framebuffer = ["#000000"] * (self.width * self.height)
+        # Packed RGB bytes, row-major; blitted to Tk as a binary PPM (P6)
+        self.framebuffer = bytearray(self.width * self.height * 3)
+        self.ppm_header = f"P6 {self.width} {self.height} 255\n".encode()
+        # 20x20 test sprite, packed RGB rows; built once, copied per blit
+        self.sprite_w = self.sprite_h = 20
+        self.sprite = memoryview(b"\xFF\xFF\xFF" * (self.sprite_w * self.sprite_h))
 
     def reset(self):
-        color = "#0011FF"
-        self.framebuffer = [color]*(self.width*self.height)
-
-    def draw_random_square(self):
-        color = "#FFFFFF"
-        x = random.randint(0, self.width-21)
-        y = random.randint(0, self.height-21)
-        for j in range(20):
-            for i in range(20):
-                idx = (y+j)*self.width + (x+i)
-                self.framebuffer[idx] = color
+        color = b"\x00\x11\xFF"
+        self.framebuffer[:] = color * (self.width*self.height)
+
+    def draw_random_square(self, _random=random.random):
+        # int(random()*n) is uniform over 0..n-1 like randint(0, n-1), at a
+        # fraction of randint's per-call cost
+        w, h = self.width, self.height
+        x = int(_random() * (w-20))
+        y = int(_random() * (h-20))
+        self.blit(self.sprite, self.sprite_w, self.sprite_h, x, y)
+
+    def blit(self, sprite, sw, sh, x, y):
+        # Copy packed RGB rows, clipped to all four framebuffer edges
+        w, h, fb = self.width, self.height, self.framebuffer
+        left, top = max(0, -x), max(0, -y)
+        span = (min(sw, w - x) - left) * 3
+        rows = min(sh, h - y) - top
+        if span <= 0 or rows <= 0:
+            return
+        stride, src_stride = w * 3, sw * 3
+        dst = (y + top)*stride + (x + left)*3
+        start = top*src_stride + left*3
+        for src in range(start, start + rows*src_stride, src_stride):
+            fb[dst:dst+span] = sprite[src:src+span]
+            dst += stride
+
+    def snapshot(self):
+        return self.ppm_header + self.framebuffer
 
     def update_display(self, image):
-        for y in range(self.height):
-            for x in range(self.width):
-                color = self.framebuffer[y*self.width+x]
-                image.put(color, (x, y))
+        put_ppm(image, self.snapshot())
         return image
 
 # ============================================================================
@@ -113,15 +415,6 @@ class SimpleController:
     def __init__(self):
         self.buttons = 0
 
-    def update(self, keys):
-        self.buttons = 0
-        if "space" in keys: self.buttons |= CONTROLLER_A
-        if "Return" in keys: self.buttons |= CONTROLLER_B
-        if "Up" in keys: self.buttons |= CONTROLLER_DPAD_UP
-        if "Down" in keys: self.buttons |= CONTROLLER_DPAD_DOWN
-        if "Left" in keys: self.buttons |= CONTROLLER_DPAD_LEFT
-        if "Right" in keys: self.buttons |= CONTROLLER_DPAD_RIGHT
-
 # ============================================================================
 # Main Launcher GUI
 # ============================================================================
@@ -136,8 +429,11 @@ class ProjectEMU64Launcher:
         self.memory = ProjectEMU64Memory()
         self.ppu = ProjectEMU64PPU()
         self.controller = SimpleController()
-        self.keys = set()
         self.running = False
+        self.tick_id = None
+        self.emu_thread = None
+        self.frame_q = deque(maxlen=2)  # SPSC ring: emu thread -> Tk thread
+        self.next_deadline = 0.0
         self.fps = 0
         self.frame_count = 0
         self.start_time = time.time()
@@ -150,7 +446,8 @@ class ProjectEMU64Launcher:
 
         self.status = tk.Label(root, text="Ready.", anchor=tk.W)
         self.status.pack(fill=tk.X, side=tk.BOTTOM)
-        self.fps_label = tk.Label(root, text="FPS: 0", font=("Courier", 10))
+        self.fps_var = tk.StringVar(value="FPS: 0")
+        self.fps_label = tk.Label(root, textvariable=self.fps_var, font=("Courier", 10))
         self.fps_label.pack()
 
         # Menu
@@ -184,18 +481,20 @@ class ProjectEMU64Launcher:
 
     # ---------------- Key Input ----------------
     def key_down(self, e):
-        self.keys.add(e.keysym)
-        self.controller.update(self.keys)
+        self.controller.buttons |= KEYMAP.get(e.keysym, 0)
 
     def key_up(self, e):
-        if e.keysym in self.keys:
-            self.keys.remove(e.keysym)
-        self.controller.update(self.keys)
+        self.controller.buttons &= ~KEYMAP.get(e.keysym, 0)
 
     # ---------------- Emulator ----------------
     def open_rom(self):
         path = filedialog.askopenfilename(title="Select ROM", filetypes=[("N64 ROM", "*.z64 *.n64 *.v64")])
         if not path: return
+        # The emulation thread reads ROM and code-page state; park it first
+        if self.running:
+            self.stop()
+        if self.emu_thread is not None:
+            self.emu_thread.join()
         try:
             with open(path, "rb") as f:
                 data = f.read()
@@ -207,33 +506,77 @@ class ProjectEMU64Launcher:
     def start(self):
         if self.running:
             return
+        if self.emu_thread is not None:
+            self.emu_thread.join()
         self.cpu.reset()
         self.ppu.reset()
+        self.frame_q.clear()
+        self.cpu.running = True
         self.running = True
         self.status.config(text="Running...")
-        threading.Thread(target=self.loop, daemon=True).start()
+        self.emu_thread = threading.Thread(target=self.emu_loop, daemon=True)
+        self.emu_thread.start()
+        self.next_deadline = time.monotonic()
+        self.tick()
 
     def stop(self):
         self.running = False
+        self.cpu.running = False
+        if self.tick_id is not None:
+            self.root.after_cancel(self.tick_id)
+            self.tick_id = None
         self.status.config(text="Stopped")
 
-    def loop(self):
-        while self.running:
-            self.cpu.execute(self.memory)
-            if random.randint(0, 10) == 0:
-                self.ppu.draw_random_square()
-            self.ppu.update_display(self.photo)
+    def tick(self):
+        # Runs on the Tk main thread; paced against monotonic deadlines so
+        # timer jitter does not accumulate into drift.
+        if not self.running:
+            return
+        frame = None
+        while self.frame_q:
+            frame = self.frame_q.popleft()  # keep only the newest frame
+        if frame is not None:
+            put_ppm(self.photo, frame)
             self.update_fps()
-            time.sleep(1/60)
+        self.next_deadline += FRAME_INTERVAL
+        now = time.monotonic()
+        if now - self.next_deadline > FRAME_INTERVAL:
+            self.next_deadline = now  # fell behind; resync instead of bursting
+        delay = max(0, int((self.next_deadline - now) * 1000))
+        self.tick_id = self.root.after(delay, self.tick)
+
+    def emu_loop(self, _monotonic=time.monotonic, _sleep=time.sleep):
+        # Producer thread: emulates and publishes frames, never touches Tk.
+        run_frame = self.run_frame
+        deadline = _monotonic()
+        while self.running:
+            deadline += FRAME_INTERVAL
+            run_frame(deadline)
+            now = _monotonic()
+            if now - deadline > FRAME_INTERVAL:
+                deadline = now
+            elif deadline > now:
+                _sleep(deadline - now)
+
+    def run_frame(self, deadline=None, _random=random.random):
+        ppu = self.ppu
+        if self.memory.rom is not None:
+            # CYCLES_PER_FRAME is an upper bound; the deadline keeps a slow
+            # interpreter from overrunning the frame and starving Tk.
+            self.cpu.run(self.memory, CYCLES_PER_FRAME, deadline)
+        if _random() < 1/11:  # same odds as randint(0, 10) == 0
+            ppu.draw_random_square()
+        self.frame_q.append(ppu.snapshot())
 
     def update_fps(self):
         self.frame_count += 1
         now = time.time()
         if now - self.start_time >= 1.0:
+            if self.frame_count != self.fps:
+                self.fps_var.set(f"FPS: {self.frame_count}")
             self.fps = self.frame_count
             self.frame_count = 0
             self.start_time = now
-            self.root.after(0, lambda: self.fps_label.config(text=f"FPS: {self.fps}"))
 
     # ---------------- Config Windows ----------------
     def config_graphics(self):